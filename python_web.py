@@ -5,10 +5,30 @@ from bs4 import BeautifulSoup
 import time
 import pandas as pd
 from collections import deque
+from array import array
 import re
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import datetime, timezone
+import sqlite3
+import threading
+import queue
+import gzip
+import os
+import glob
+import uuid
+import hashlib
+import base64
+
+# On-disk location of the full-text index of crawled/scraped pages
+INDEX_PATH = "webspy_index.db"
+
+# Maximum number of content-ranked suggestions kept per crawl
+SUGGESTION_LIMIT = 100
+
+# Default directory and rotation size for WARC archives of crawled responses
+ARCHIVE_DIR = "webspy_archive"
+ARCHIVE_MAX_BYTES = 100 * 1024 * 1024
 
 # Custom Queue Implementation for BFS (keeping original)
 class Queue:
@@ -41,16 +61,465 @@ class Queue:
             return self.queue[0]
         return None
 
+# BFS frontier of (url_id, depth) pairs kept in flat arrays instead of tuples
+class FrontierQueue(Queue):
+    def __init__(self, max_size=1000):
+        self.ids = array('I')
+        self.depths = array('H')
+        self.head = 0
+        self.max_size = max_size
+    
+    def enqueue(self, item):
+        if self.size() < self.max_size:
+            url_id, depth = item
+            self.ids.append(url_id)
+            self.depths.append(depth)
+            return True
+        return False
+    
+    def dequeue(self):
+        if self.is_empty():
+            return None
+        item = (self.ids[self.head], self.depths[self.head])
+        self.head += 1
+        # Drop the consumed prefix once it dominates the buffers
+        if self.head >= 4096 and self.head * 2 >= len(self.ids):
+            del self.ids[:self.head]
+            del self.depths[:self.head]
+            self.head = 0
+        return item
+    
+    def is_empty(self):
+        return self.head >= len(self.ids)
+    
+    def is_full(self):
+        return self.size() >= self.max_size
+    
+    def size(self):
+        return len(self.ids) - self.head
+    
+    def front(self):
+        if not self.is_empty():
+            return (self.ids[self.head], self.depths[self.head])
+        return None
+
+# Compact URL store: integer IDs, shared "scheme://host/dir/" prefixes stored once,
+# per-URL remainders packed into a single UTF-8 buffer
+class URLStore:
+    def __init__(self):
+        self.prefixes = []              # prefix id -> "scheme://host/dir/"
+        self.prefix_ids = {}
+        self.prefix_hosts = array('I')  # prefix id -> host id
+        self.hosts = []                 # host id -> netloc
+        self.host_ids = {}
+        self.url_prefix = array('I')    # url id -> prefix id
+        self.url_hash = array('q')      # url id -> hash of (prefix id, remainder)
+        self.offsets = array('Q', [0])  # url id -> start of its remainder in blob
+        self.blob = bytearray()
+        # Open-addressing table of url ids (-1 = empty slot), kept at most half full
+        self.slots = array('i', [-1]) * 1024
+    
+    def __len__(self):
+        return len(self.url_prefix)
+    
+    def split(self, url):
+        """Split a URL into its directory prefix and the remainder"""
+        scheme_end = url.find('://')
+        start = scheme_end + 3 if scheme_end != -1 else 0
+        # A '/' inside the query or fragment is not a path separator
+        end = len(url)
+        for marker in '?#':
+            pos = url.find(marker, start)
+            if pos != -1 and pos < end:
+                end = pos
+        cut = url.rfind('/', start, end)
+        cut = cut + 1 if cut != -1 else end
+        return url[:cut], url[cut:]
+    
+    def intern_prefix(self, prefix):
+        """Return the id of a prefix, registering it and its host if new"""
+        prefix_id = self.prefix_ids.get(prefix)
+        if prefix_id is None:
+            host = urlparse(prefix).netloc
+            host_id = self.host_ids.get(host)
+            if host_id is None:
+                host_id = len(self.hosts)
+                self.hosts.append(host)
+                self.host_ids[host] = host_id
+            prefix_id = len(self.prefixes)
+            self.prefixes.append(prefix)
+            self.prefix_ids[prefix] = prefix_id
+            self.prefix_hosts.append(host_id)
+        return prefix_id
+    
+    def find_slot(self, prefix_id, suffix, url_hash):
+        """Return the slot holding this URL, or the empty slot where it belongs"""
+        slots, mask = self.slots, len(self.slots) - 1
+        encoded = suffix.encode('utf-8')
+        pos = url_hash & mask
+        while True:
+            url_id = slots[pos]
+            if url_id == -1:
+                return pos
+            if (self.url_hash[url_id] == url_hash and self.url_prefix[url_id] == prefix_id
+                    and self.blob[self.offsets[url_id]:self.offsets[url_id + 1]] == encoded):
+                return pos
+            pos = (pos + 1) & mask
+    
+    def grow(self):
+        """Double the slot table and reinsert every id"""
+        slots = array('i', [-1]) * (len(self.slots) * 2)
+        mask = len(slots) - 1
+        for url_id, url_hash in enumerate(self.url_hash):
+            pos = url_hash & mask
+            while slots[pos] != -1:
+                pos = (pos + 1) & mask
+            slots[pos] = url_id
+        self.slots = slots
+    
+    def add(self, url):
+        """Return the id of a URL, assigning a new one if unseen"""
+        prefix, suffix = self.split(url)
+        prefix_id = self.intern_prefix(prefix)
+        url_hash = hash((prefix_id, suffix))
+        pos = self.find_slot(prefix_id, suffix, url_hash)
+        if self.slots[pos] != -1:
+            return self.slots[pos]
+        
+        url_id = len(self.url_prefix)
+        self.url_prefix.append(prefix_id)
+        self.url_hash.append(url_hash)
+        self.blob += suffix.encode('utf-8')
+        self.offsets.append(len(self.blob))
+        self.slots[pos] = url_id
+        if len(self.url_prefix) * 2 > len(self.slots):
+            self.grow()
+        return url_id
+    
+    def lookup(self, url):
+        """Return the id of a known URL, or None"""
+        prefix, suffix = self.split(url)
+        prefix_id = self.prefix_ids.get(prefix)
+        if prefix_id is None:
+            return None
+        url_id = self.slots[self.find_slot(prefix_id, suffix, hash((prefix_id, suffix)))]
+        return url_id if url_id != -1 else None
+    
+    def get(self, url_id):
+        """Rebuild the URL string for an id"""
+        suffix = self.blob[self.offsets[url_id]:self.offsets[url_id + 1]].decode('utf-8')
+        return self.prefixes[self.url_prefix[url_id]] + suffix
+    
+    def get_many(self, url_ids):
+        """Rebuild URL strings for a sequence of ids"""
+        return [self.get(url_id) for url_id in url_ids]
+    
+    def host_id(self, url_id):
+        """Host id of a URL id"""
+        return self.prefix_hosts[self.url_prefix[url_id]]
+    
+    def host(self, url_id):
+        """Netloc of a URL id"""
+        return self.hosts[self.host_id(url_id)]
+
+# Full-text Content Index (SQLite FTS5, BM25 ranking)
+class ContentIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            # docs maps each URL to a stable rowid in the FTS table
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5("
+                "url UNINDEXED, domain UNINDEXED, title, headings, body, "
+                "tokenize='porter unicode61')"
+            )
+
+    def add_page(self, url, title, headings, body):
+        """Insert or replace the indexed text of a page"""
+        domain = urlparse(url).netloc
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO docs (url) VALUES (?)", (url,))
+            doc_id = self.conn.execute("SELECT id FROM docs WHERE url = ?", (url,)).fetchone()[0]
+            self.conn.execute("DELETE FROM pages WHERE rowid = ?", (doc_id,))
+            self.conn.execute(
+                "INSERT INTO pages (rowid, url, domain, title, headings, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_id, url, domain, title, headings, body)
+            )
+
+    def build_query(self, text):
+        """Turn free text into an FTS5 OR-query of quoted terms"""
+        terms = re.findall(r"\w+", text.lower())
+        return " OR ".join(f'"{term}"' for term in terms)
+
+    def search(self, text, domain=None, limit=50, urls=None):
+        """Return pages matching text, best BM25 score first, optionally only among urls"""
+        query = self.build_query(text)
+        if not query:
+            return []
+
+        # Title matches weigh most, then headings, then body text
+        sql = ("SELECT pages.url, pages.title, bm25(pages, 0, 0, 10.0, 5.0, 1.0) AS score "
+               "FROM pages")
+        if urls is not None:
+            # Drive the query from the candidate URLs via docs.id = pages.rowid
+            sql += (" JOIN docs ON docs.id = pages.rowid"
+                    " JOIN search_urls ON search_urls.url = docs.url")
+        sql += " WHERE pages MATCH ?"
+        params = [query]
+        if domain:
+            sql += " AND pages.domain = ?"
+            params.append(domain)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self.lock:
+            if urls is not None:
+                # Connection-local temp table, refilled under the lock for each search
+                self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS search_urls (url TEXT PRIMARY KEY)")
+                self.conn.execute("DELETE FROM search_urls")
+                self.conn.executemany("INSERT OR IGNORE INTO search_urls (url) VALUES (?)",
+                                      ((url,) for url in urls))
+            rows = self.conn.execute(sql, params).fetchall()
+        # FTS5 bm25() is negative (lower is better); flip it for display
+        return [{'url': url, 'title': title, 'score': -score} for url, title, score in rows]
+
+    def count(self):
+        """Number of indexed pages"""
+        with self.lock:
+            return self.conn.execute("SELECT count(*) FROM pages").fetchone()[0]
+
+# WARC archive writer: gzip-member records, size-rotated files, background thread
+class WARCWriter:
+    # Hop-by-hop/transport headers that no longer describe the decoded body
+    DROP_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+    
+    def __init__(self, directory=ARCHIVE_DIR, max_bytes=ARCHIVE_MAX_BYTES, prefix="webspy"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        # Keeps file names unique when several crawls archive at once
+        self.writer_id = uuid.uuid4().hex[:8]
+        self.files = []
+        self.file = None
+        self.file_size = 0
+        self.records_written = 0
+        self.error = None
+        self.closed = False
+        # Unbounded so the fetch loop never waits on disk
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="warc-writer", daemon=True)
+        self.thread.start()
+    
+    def archive_response(self, response):
+        """Queue a requests.Response, its redirect hops and their requests for archiving"""
+        if self.closed or self.error:
+            return
+        date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        # Each redirect hop becomes its own response record, in fetch order,
+        # so replay can map the final page back to the URL the crawl requested
+        exchanges = []
+        for hop in response.history + [response]:
+            request = hop.request
+            version = {10: "1.0", 11: "1.1"}.get(getattr(hop.raw, 'version', 11), "1.1")
+            exchanges.append({
+                'url': hop.url,
+                'date': date,
+                'request_line': f"{request.method} {request.path_url} HTTP/{version}",
+                'request_headers': [('Host', urlparse(hop.url).netloc)] + list(request.headers.items()),
+                'status_line': f"HTTP/{version} {hop.status_code} {hop.reason}",
+                'response_headers': list(hop.headers.items()),
+                'body': hop.content
+            })
+        self.pending.put(exchanges)
+    
+    def close(self):
+        """Flush queued records and close the current file"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.thread.join()
+    
+    def run(self):
+        """Writer thread body"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            # After a failed write (full disk, permissions) drop the rest of the queue
+            if self.error:
+                continue
+            try:
+                # Rotate only between fetches so redirect hops, the final response
+                # and their request records always share a file
+                if self.file is None or self.file_size >= self.max_bytes:
+                    self.open_next_file()
+                for exchange in item:
+                    self.write_exchange(exchange)
+            except Exception as e:
+                self.error = str(e)
+        if self.file:
+            try:
+                self.file.close()
+            except Exception as e:
+                self.error = self.error or str(e)
+            self.file = None
+    
+    def write_exchange(self, item):
+        """Write a response record and its concurrent request record"""
+        body = item['body']
+        headers = [(k, v) for k, v in item['response_headers'] if k.lower() not in self.DROP_HEADERS]
+        headers.append(('Content-Length', str(len(body))))
+        http_response = self.http_block(item['status_line'], headers) + body
+        http_request = self.http_block(item['request_line'], item['request_headers'])
+        
+        response_id = f"<urn:uuid:{uuid.uuid4()}>"
+        digest = base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+        self.write_record([
+            ('WARC-Type', 'response'),
+            ('WARC-Record-ID', response_id),
+            ('WARC-Date', item['date']),
+            ('WARC-Target-URI', item['url']),
+            ('WARC-Payload-Digest', f"sha1:{digest}"),
+            ('Content-Type', 'application/http;msgtype=response')
+        ], http_response)
+        self.write_record([
+            ('WARC-Type', 'request'),
+            ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"),
+            ('WARC-Date', item['date']),
+            ('WARC-Target-URI', item['url']),
+            ('WARC-Concurrent-To', response_id),
+            ('Content-Type', 'application/http;msgtype=request')
+        ], http_request)
+    
+    def http_block(self, first_line, headers):
+        """Serialize an HTTP start line and headers"""
+        lines = [first_line] + [f"{k}: {v}" for k, v in headers]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('utf-8')
+    
+    def write_record(self, warc_headers, block):
+        """Append one record as its own gzip member to the current file"""
+        header = "WARC/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in warc_headers)
+        header += f"Content-Length: {len(block)}\r\n\r\n"
+        member = gzip.compress(header.encode('utf-8') + block + b"\r\n\r\n")
+        self.file.write(member)
+        self.file_size += len(member)
+        self.records_written += 1
+    
+    def open_next_file(self):
+        """Start a new archive file beginning with a warcinfo record"""
+        if self.file:
+            self.file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{self.writer_id}-{len(self.files):05d}.warc.gz")
+        self.file = open(path, 'wb')
+        self.file_size = 0
+        self.files.append(path)
+        info = b"software: WEBSPY\r\nformat: WARC File Format 1.1\r\n"
+        self.write_record([
+            ('WARC-Type', 'warcinfo'),
+            ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"),
+            ('WARC-Date', datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')),
+            ('WARC-Filename', os.path.basename(path)),
+            ('Content-Type', 'application/warc-fields')
+        ], info)
+
+def find_archives(path):
+    """Expand a WARC file, directory or glob pattern into sorted archive paths"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.warc.gz")) + glob.glob(os.path.join(path, "*.warc")))
+    return sorted(glob.glob(path))
+
+def iter_warc_records(paths):
+    """Yield (lower-cased WARC headers, content block) for every record in the archives"""
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        # gzip.open reads concatenated members as one stream
+        with opener(path, 'rb') as f:
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                if not line.startswith(b"WARC/"):
+                    raise ValueError(f"Malformed WARC record in {path}")
+                headers = {}
+                while True:
+                    line = f.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('utf-8').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                block = f.read(int(headers.get('content-length', 0)))
+                yield headers, block
+
+def parse_http_response(block):
+    """Split an archived HTTP response into (status code, lower-cased headers, body)"""
+    head, _, body = block.partition(b"\r\n\r\n")
+    lines = head.decode('iso-8859-1').split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, body
+
+# Compact per-page scrape record captured during the crawl parse pass
+class PageRecord:
+    __slots__ = ('url', 'title', 'meta_description', 'h1', 'h2', 'h3', 'paragraphs', 'total_paragraphs')
+    
+    def __init__(self, url, title, meta_description, h1, h2, h3, paragraphs, total_paragraphs):
+        self.url = url
+        self.title = title
+        self.meta_description = meta_description
+        self.h1 = h1
+        self.h2 = h2
+        self.h3 = h3
+        self.paragraphs = paragraphs
+        self.total_paragraphs = total_paragraphs
+    
+    def to_dict(self):
+        """Return the record in the scrape_content result format"""
+        return {
+            'url': self.url,
+            'title': self.title,
+            'meta_description': self.meta_description,
+            'headings': {'h1': list(self.h1), 'h2': list(self.h2), 'h3': list(self.h3)},
+            'paragraphs': list(self.paragraphs),
+            'total_paragraphs': self.total_paragraphs
+        }
+
+# Per-URL flag bits, one byte per URL id
+VISITED = 1
+INTERNAL = 2
+EXTERNAL = 4
+SUGGESTED = 8
+
 # Web Crawler Class (keeping original functionality)
 class WebCrawler:
-    def __init__(self, max_urls=100, delay=1):
-        self.visited_urls = set()
-        self.internal_links = []
-        self.external_links = []
-        self.suggested_urls = []
+    def __init__(self, max_urls=100, delay=1, index=None, capture_content=True, archive=None):
+        # URLs are stored once in the URL store; collections hold integer ids
+        self.urls = URLStore()
+        self.url_flags = bytearray()
+        self.visited_count = 0
+        self.internal_ids = array('I')
+        self.external_ids = array('I')
+        self.suggested_ids = array('I')
+        self.suggested_scores = {}
         self.scraped_data = []
+        self.page_records = {}
+        self.capture_content = capture_content
         self.max_urls = max_urls
         self.delay = delay
+        self.index = index
+        self.archive = archive
         self.base_domain = None
         self.crawl_stats = {
             'start_time': None,
@@ -58,6 +527,70 @@ class WebCrawler:
             'total_time': 0,
             'pages_per_second': 0
         }
+        # Live progress and control, read/set from the UI thread while a job runs
+        self.current_url = None
+        self.current_depth = 0
+        self.crawled_count = 0
+        self.messages = deque(maxlen=100)
+        self.worker = None
+        # URLStore.add is a multi-step update; the crawl worker and the UI thread
+        # (scrape_content) can both intern URLs, so writes are serialized
+        self.url_lock = threading.Lock()
+        self.running = threading.Event()
+        self.running.set()
+        self.cancelled = threading.Event()
+    
+    def pause(self):
+        """Pause the crawl loop before its next page"""
+        self.running.clear()
+    
+    def resume(self):
+        """Resume a paused crawl"""
+        self.running.set()
+    
+    def cancel(self):
+        """Stop the crawl loop, waking it if paused"""
+        self.cancelled.set()
+        self.running.set()
+    
+    def notify(self, message):
+        """Record a crawl message; also show it when not on a background worker"""
+        self.messages.append(message)
+        if threading.current_thread() is not self.worker:
+            st.warning(message)
+    
+    @property
+    def visited_urls(self):
+        """Visited URLs rebuilt from the URL store"""
+        return set(self.urls.get_many(i for i, flags in enumerate(self.url_flags) if flags & VISITED))
+    
+    @property
+    def internal_links(self):
+        """Internal links rebuilt from the URL store"""
+        return self.urls.get_many(self.internal_ids)
+    
+    @property
+    def external_links(self):
+        """External links rebuilt from the URL store"""
+        return self.urls.get_many(self.external_ids)
+    
+    @property
+    def suggested_urls(self):
+        """Suggested URLs rebuilt from the URL store"""
+        return self.urls.get_many(self.suggested_ids)
+    
+    def add_url(self, url):
+        """Intern a URL and make room for its flags"""
+        with self.url_lock:
+            url_id = self.urls.add(url)
+            if url_id >= len(self.url_flags):
+                self.url_flags.extend(bytes(url_id + 1 - len(self.url_flags)))
+        return url_id
+    
+    def get_record(self, url):
+        """Scrape record captured for a URL, or None"""
+        url_id = self.urls.lookup(url)
+        return self.page_records.get(url_id) if url_id is not None else None
     
     def is_valid_url(self, url):
         """Check if URL is valid"""
@@ -81,17 +614,21 @@ class WebCrawler:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             response = requests.get(url, headers=headers, timeout=10)
+            # Archive every response, errors included, before status handling
+            if self.archive is not None:
+                self.archive.archive_response(response)
             response.raise_for_status()
             return response.text
         except Exception as e:
-            st.warning(f"⚠️ Error fetching {url}: {str(e)}")
+            self.notify(f"⚠️ Error fetching {url}: {str(e)}")
             return None
     
-    def extract_links(self, html_content, base_url):
-        """Extract all links from HTML content"""
+    def extract_links(self, html_content, base_url, soup=None):
+        """Extract all links from HTML content (or an already parsed soup)"""
         links = []
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'html.parser')
             for link in soup.find_all('a', href=True):
                 href = link['href']
                 full_url = urljoin(base_url, href)
@@ -99,146 +636,385 @@ class WebCrawler:
                 if self.is_valid_url(full_url):
                     links.append(full_url)
         except Exception as e:
-            st.error(f"❌ Error extracting links: {str(e)}")
+            self.notify(f"❌ Error extracting links: {str(e)}")
         
         return links
     
-    def crawl_bfs(self, start_url, keyword="", max_depth=2):
-        """Crawl websites using BFS algorithm"""
-        self.crawl_stats['start_time'] = datetime.now()
-        self.base_domain = self.get_domain(start_url)
+    def extract_text(self, soup):
+        """Extract title, headings and body text for the full-text index"""
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else ""
+        headings = " ".join(h.get_text(" ", strip=True) for h in soup.find_all(['h1', 'h2', 'h3']))
+        for tag in soup(['script', 'style', 'noscript']):
+            tag.decompose()
+        body = soup.get_text(" ", strip=True)
+        return title_text, headings, body
+    
+    def extract_record(self, soup, url):
+        """Build the scrape record (title, meta, headings, paragraphs) from a parsed page"""
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else "No title found"
         
-        # Initialize BFS queue
-        url_queue = Queue(max_size=self.max_urls)
-        url_queue.enqueue((start_url, 0))  # (url, depth)
+        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_description = meta_desc.get('content', '') if meta_desc else ''
         
-        # Create columns for progress display
-        col1, col2, col3 = st.columns([2, 1, 1])
+        paragraphs = [p.get_text().strip() for p in soup.find_all('p')]
         
-        with col1:
-            progress_bar = st.progress(0)
-        with col2:
-            progress_text = st.empty()
-        with col3:
-            speed_text = st.empty()
+        return PageRecord(
+            url,
+            title_text,
+            meta_description,
+            tuple(h.get_text().strip() for h in soup.find_all('h1')),
+            tuple(h.get_text().strip() for h in soup.find_all('h2')),
+            tuple(h.get_text().strip() for h in soup.find_all('h3')),
+            tuple(paragraphs[:5]),  # First 5 paragraphs
+            len(paragraphs)
+        )
+    
+    def index_page(self, url, soup):
+        """Add a parsed page to the full-text index"""
+        if self.index is None:
+            return
+        try:
+            self.index.add_page(url, *self.extract_text(soup))
+        except Exception as e:
+            self.notify(f"⚠️ Error indexing {url}: {str(e)}")
+    
+    def rank_suggestions(self, keyword):
+        """Rank crawled pages by BM25 relevance of their content to keyword"""
+        if not keyword or self.index is None:
+            return
+        
+        # The shared index also holds pages from other crawls and sessions;
+        # restrict the ranking to pages this crawl visited in the query itself
+        results = self.index.search(keyword, domain=self.base_domain, limit=SUGGESTION_LIMIT,
+                                    urls=self.visited_urls)
+        self.suggested_scores = {r['url']: r['score'] for r in results}
+        
+        ranked = array('I')
+        seen = set()
+        for result in results:
+            url_id = self.urls.lookup(result['url'])
+            if url_id is not None and url_id not in seen:
+                seen.add(url_id)
+                self.url_flags[url_id] |= SUGGESTED
+                ranked.append(url_id)
         
-        status_container = st.container()
+        # Pages whose content matches come first, then URL-only matches
+        ranked.extend(url_id for url_id in self.suggested_ids if url_id not in seen)
+        self.suggested_ids = ranked
+    
+    def process_page(self, page_id, html_content, keyword, base_host_id):
+        """Parse a fetched page once and record its links; returns new internal link ids"""
+        page_url = self.urls.get(page_id)
+        keyword_lower = keyword.lower()
+        new_internal = []
         
-        crawled_count = 0
+        # Parse once: links, scrape record and index text share the same soup.
+        # Indexing strips script/style tags, so it runs last.
+        soup = BeautifulSoup(html_content, 'html.parser')
+        links = self.extract_links(html_content, page_url, soup=soup)
+        if self.capture_content:
+            try:
+                self.page_records[page_id] = self.extract_record(soup, page_url)
+            except Exception as e:
+                self.notify(f"⚠️ Error capturing content of {page_url}: {str(e)}")
+        self.index_page(page_url, soup)
         
-        while not url_queue.is_empty() and crawled_count < self.max_urls:
-            current_url, depth = url_queue.dequeue()
+        for link in links:
+            link_id = self.add_url(link)
+            flags = self.url_flags[link_id]
+            
+            if self.urls.host_id(link_id) == base_host_id:
+                # Internal link
+                if not flags & INTERNAL:
+                    flags |= INTERNAL
+                    self.internal_ids.append(link_id)
+                    
+                    # Check if link contains keyword
+                    if keyword and keyword_lower in link.lower():
+                        flags |= SUGGESTED
+                        self.suggested_ids.append(link_id)
+                    
+                    if not flags & VISITED:
+                        new_internal.append(link_id)
+            else:
+                # External link
+                if not flags & EXTERNAL:
+                    flags |= EXTERNAL
+                    self.external_ids.append(link_id)
+            self.url_flags[link_id] = flags
+        
+        return new_internal
+    
+    def mark_visited(self, page_id, depth):
+        """Mark a page as visited; returns False if it already was"""
+        if self.url_flags[page_id] & VISITED:
+            return False
+        self.url_flags[page_id] |= VISITED
+        self.visited_count += 1
+        self.crawled_count += 1
+        self.current_url = self.urls.get(page_id)
+        self.current_depth = depth
+        return True
+    
+    def finish_crawl(self, keyword):
+        """Rank suggestions, finalize stats and flush the archive"""
+        self.current_url = None
+        self.rank_suggestions(keyword)
+        
+        if self.archive is not None:
+            self.archive.close()
+            if self.archive.error:
+                self.notify(f"❌ WARC archiving stopped: {self.archive.error}")
+        
+        # Finalize stats
+        self.crawl_stats['end_time'] = datetime.now()
+        self.crawl_stats['total_time'] = (self.crawl_stats['end_time'] - self.crawl_stats['start_time']).total_seconds()
+        self.crawl_stats['pages_per_second'] = self.crawled_count / self.crawl_stats['total_time'] if self.crawl_stats['total_time'] > 0 else 0
+    
+    def crawl_bfs(self, start_url, keyword="", max_depth=2):
+        """Crawl websites using BFS algorithm (UI-free, safe to run on a worker thread)"""
+        self.crawl_stats['start_time'] = datetime.now()
+        self.base_domain = self.get_domain(start_url)
+        
+        # Initialize BFS queue of (url_id, depth)
+        start_id = self.add_url(start_url)
+        base_host_id = self.urls.host_id(start_id)
+        url_queue = FrontierQueue(max_size=self.max_urls)
+        url_queue.enqueue((start_id, 0))
+        
+        while not url_queue.is_empty() and self.crawled_count < self.max_urls:
+            # Block while paused; cancel() also wakes a paused loop
+            self.running.wait()
+            if self.cancelled.is_set():
+                break
+            
+            current_id, depth = url_queue.dequeue()
             
             if depth > max_depth:
                 continue
             
-            if current_url in self.visited_urls:
+            if not self.mark_visited(current_id, depth):
                 continue
-                
-            self.visited_urls.add(current_url)
-            crawled_count += 1
-            
-            # Update progress
-            progress = min(crawled_count / self.max_urls, 1.0)
-            progress_bar.progress(progress)
-            progress_text.metric("Progress", f"{crawled_count}/{self.max_urls}")
-            
-            # Calculate speed
-            elapsed_time = (datetime.now() - self.crawl_stats['start_time']).total_seconds()
-            if elapsed_time > 0:
-                speed = crawled_count / elapsed_time
-                speed_text.metric("Speed", f"{speed:.1f} pages/sec")
-            
-            # Show current URL being crawled
-            with status_container:
-                st.info(f"🔍 **Crawling:** `{current_url}` (Depth: {depth})")
             
             # Fetch page content
-            html_content = self.fetch_page(current_url)
+            html_content = self.fetch_page(self.current_url)
             if not html_content:
                 continue
             
-            # Extract links
-            links = self.extract_links(html_content, current_url)
-            
-            for link in links:
-                link_domain = self.get_domain(link)
-                
-                if link_domain == self.base_domain:
-                    # Internal link
-                    if link not in self.internal_links:
-                        self.internal_links.append(link)
-                        
-                        # Check if link contains keyword
-                        if keyword and keyword.lower() in link.lower():
-                            self.suggested_urls.append(link)
-                        
-                        # Add to queue for further crawling
-                        if link not in self.visited_urls:
-                            url_queue.enqueue((link, depth + 1))
-                else:
-                    # External link
-                    if link not in self.external_links:
-                        self.external_links.append(link)
+            # Add new internal links to the queue for further crawling
+            for link_id in self.process_page(current_id, html_content, keyword, base_host_id):
+                url_queue.enqueue((link_id, depth + 1))
             
-            # Add delay to be respectful
-            time.sleep(self.delay)
+            # Add delay to be respectful (returns early on cancel)
+            self.cancelled.wait(self.delay)
         
-        # Finalize stats
-        self.crawl_stats['end_time'] = datetime.now()
-        self.crawl_stats['total_time'] = (self.crawl_stats['end_time'] - self.crawl_stats['start_time']).total_seconds()
-        self.crawl_stats['pages_per_second'] = crawled_count / self.crawl_stats['total_time'] if self.crawl_stats['total_time'] > 0 else 0
+        self.finish_crawl(keyword)
+    
+    def replay_archive(self, paths, keyword=""):
+        """Run the crawl parse pass offline over archived WARC responses, at disk speed"""
+        self.crawl_stats['start_time'] = datetime.now()
+        base_host_id = None
+        # Redirect target -> URL the live crawl requested (requests follows redirects,
+        # so the crawl parsed the final body under the original URL)
+        redirect_origins = {}
         
-        progress_bar.progress(1.0)
-        status_container.success(f"✅ **Crawling completed!** Found {len(self.internal_links)} internal and {len(self.external_links)} external links in {self.crawl_stats['total_time']:.1f} seconds.")
+        try:
+            for warc_headers, block in iter_warc_records(paths):
+                self.running.wait()
+                if self.cancelled.is_set():
+                    break
+                
+                if warc_headers.get('warc-type') != 'response':
+                    continue
+                target = warc_headers['warc-target-uri']
+                url = redirect_origins.pop(target, target)
+                status, http_headers, body = parse_http_response(block)
+                
+                # A redirect hop: the next record in this fetch is its target
+                if 300 <= status < 400 and 'location' in http_headers:
+                    redirect_origins[urljoin(target, http_headers['location'])] = url
+                    continue
+                
+                page_id = self.add_url(url)
+                # Links are classified relative to the first archived page's host
+                if base_host_id is None:
+                    base_host_id = self.urls.host_id(page_id)
+                    self.base_domain = self.get_domain(url)
+                
+                if not self.mark_visited(page_id, 0):
+                    continue
+                
+                # Same rule as the live crawl: fetch_page drops error statuses
+                # (raise_for_status) and crawl_bfs skips empty bodies
+                if status >= 400 or not body:
+                    continue
+                
+                # Decode like response.text: header charset, else detected encoding
+                encoding = (requests.utils.get_encoding_from_headers(http_headers)
+                            or requests.compat.chardet.detect(body)['encoding'] or 'utf-8')
+                html_content = body.decode(encoding, errors='replace')
+                self.process_page(page_id, html_content, keyword, base_host_id)
+        except Exception as e:
+            self.notify(f"❌ Error reading archive: {str(e)}")
+        
+        self.finish_crawl(keyword)
     
     def scrape_content(self, url):
         """Scrape content from a specific URL"""
+        # Pages captured during the crawl need no refetch or reparse
+        record = self.get_record(url)
+        if record is not None:
+            return record.to_dict()
+        
         html_content = self.fetch_page(url)
         if not html_content:
             return None
         
         try:
             soup = BeautifulSoup(html_content, 'html.parser')
+            record = self.extract_record(soup, url)
+            if self.capture_content:
+                self.page_records[self.add_url(url)] = record
             
-            # Extract title
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else "No title found"
-            
-            # Extract headings
-            headings = {
-                'h1': [h.get_text().strip() for h in soup.find_all('h1')],
-                'h2': [h.get_text().strip() for h in soup.find_all('h2')],
-                'h3': [h.get_text().strip() for h in soup.find_all('h3')]
-            }
+            # Keep the index current with the freshly scraped page
+            self.index_page(url, soup)
             
-            # Extract paragraphs
-            paragraphs = [p.get_text().strip() for p in soup.find_all('p')]
-            
-            # Extract meta description
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            meta_description = meta_desc.get('content', '') if meta_desc else ''
-            
-            return {
-                'url': url,
-                'title': title_text,
-                'meta_description': meta_description,
-                'headings': headings,
-                'paragraphs': paragraphs[:5],  # First 5 paragraphs
-                'total_paragraphs': len(paragraphs)
-            }
+            return record.to_dict()
         except Exception as e:
             st.error(f"❌ Error scraping {url}: {str(e)}")
             return None
 
+# Background crawl job: one WebCrawler driven by a worker thread
+class CrawlJob:
+    def __init__(self, job_id, crawler, start_url, keyword="", max_depth=2, replay_paths=None):
+        self.job_id = job_id
+        self.crawler = crawler
+        self.start_url = start_url
+        self.keyword = keyword
+        self.max_depth = max_depth
+        self.replay_paths = replay_paths
+        self.created = datetime.now()
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name=f"crawl-{job_id}", daemon=True)
+        crawler.worker = self.thread
+    
+    def run(self):
+        """Worker thread body"""
+        try:
+            if self.replay_paths is not None:
+                self.crawler.replay_archive(self.replay_paths, self.keyword)
+            else:
+                self.crawler.crawl_bfs(self.start_url, self.keyword, self.max_depth)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if self.crawler.archive is not None:
+                self.crawler.archive.close()
+    
+    def start(self):
+        self.thread.start()
+    
+    def pause(self):
+        self.crawler.pause()
+    
+    def resume(self):
+        self.crawler.resume()
+    
+    def cancel(self):
+        self.crawler.cancel()
+    
+    @property
+    def state(self):
+        """One of running, paused, completed, cancelled or failed"""
+        if self.error:
+            return 'failed'
+        if self.thread.is_alive():
+            return 'running' if self.crawler.running.is_set() else 'paused'
+        return 'cancelled' if self.crawler.cancelled.is_set() else 'completed'
+    
+    def is_active(self):
+        return self.thread.is_alive()
+    
+    def snapshot(self):
+        """Cheap point-in-time view of job progress for the dashboard"""
+        crawler = self.crawler
+        start_time = crawler.crawl_stats['start_time']
+        elapsed = (datetime.now() - start_time).total_seconds() if start_time else 0
+        if crawler.crawl_stats['end_time']:
+            elapsed = crawler.crawl_stats['total_time']
+        return {
+            'job_id': self.job_id,
+            'state': self.state,
+            'start_url': self.start_url,
+            'crawled': crawler.crawled_count,
+            'max_urls': crawler.max_urls,
+            'internal': len(crawler.internal_ids),
+            'external': len(crawler.external_ids),
+            'suggested': len(crawler.suggested_ids),
+            'current_url': crawler.current_url,
+            'current_depth': crawler.current_depth,
+            'elapsed': elapsed,
+            'speed': crawler.crawled_count / elapsed if elapsed > 0 else 0,
+            'error': self.error,
+            'replay': self.replay_paths is not None,
+            'archived': crawler.archive.records_written if crawler.archive else 0,
+            'archive_files': len(crawler.archive.files) if crawler.archive else 0,
+            'archive_error': crawler.archive.error if crawler.archive else None,
+            'messages': list(crawler.messages)[-5:]
+        }
+
+# Registry of crawl jobs, shared by every session of the server process
+class CrawlJobRegistry:
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+    
+    def submit(self, crawler, start_url, keyword="", max_depth=2, replay_paths=None):
+        """Create and start a background crawl (or archive replay) job"""
+        with self.lock:
+            job = CrawlJob(self.next_id, crawler, start_url, keyword, max_depth, replay_paths)
+            self.jobs[job.job_id] = job
+            self.next_id += 1
+        job.start()
+        return job
+    
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def list(self):
+        """All jobs, newest first"""
+        with self.lock:
+            return sorted(self.jobs.values(), key=lambda job: job.job_id, reverse=True)
+    
+    def remove(self, job_id):
+        """Cancel a job and drop it from the registry"""
+        with self.lock:
+            job = self.jobs.pop(job_id, None)
+        if job:
+            job.cancel()
+
+@st.cache_resource
+def get_content_index():
+    """Shared on-disk full-text index, opened once per server process"""
+    return ContentIndex(INDEX_PATH)
+
+@st.cache_resource
+def get_job_registry():
+    """Shared crawl job registry, created once per server process"""
+    return CrawlJobRegistry()
+
 def create_stats_chart(crawler):
     """Create a beautiful stats chart"""
-    if not hasattr(crawler, 'internal_links'):
+    if not hasattr(crawler, 'internal_ids'):
         return None
     
     # Create pie chart for link distribution
     labels = ['Internal Links', 'External Links', 'Suggested URLs']
-    values = [len(crawler.internal_links), len(crawler.external_links), len(crawler.suggested_urls)]
+    values = [len(crawler.internal_ids), len(crawler.external_ids), len(crawler.suggested_ids)]
     colors = ['#FF6B6B', '#4ECDC4', '#45B7D1']
     
     fig = go.Figure(data=[go.Pie(
@@ -269,8 +1045,8 @@ def display_advanced_metrics(crawler):
     with col1:
         st.metric(
             label="🔗 Total Links",
-            value=len(crawler.internal_links) + len(crawler.external_links),
-            delta=f"+{len(crawler.suggested_urls)} suggested"
+            value=len(crawler.internal_ids) + len(crawler.external_ids),
+            delta=f"+{len(crawler.suggested_ids)} suggested"
         )
     
     with col2:
@@ -283,17 +1059,101 @@ def display_advanced_metrics(crawler):
     with col3:
         st.metric(
             label="🌐 Domains Found",
-            value=len(set([crawler.get_domain(url) for url in crawler.external_links if crawler.get_domain(url)])),
+            value=len({crawler.urls.host_id(url_id) for url_id in crawler.external_ids if crawler.urls.host(url_id)}),
             delta="External domains"
         )
     
     with col4:
         st.metric(
             label="📊 Success Rate",
-            value=f"{(len(crawler.internal_links) / max(len(crawler.visited_urls), 1) * 100):.1f}%",
+            value=f"{(len(crawler.internal_ids) / max(crawler.visited_count, 1) * 100):.1f}%",
             delta="Link extraction"
         )
 
+def read_links(crawler, kind):
+    """Rebuild link strings for this rerun only from a point-in-time copy of the id array"""
+    # Nothing is cached in session state, so the strings are freed after the rerun
+    # and the id arrays stay the only per-URL storage
+    return crawler.urls.get_many(getattr(crawler, f"{kind}_ids")[:])
+
+def select_crawl_job():
+    """Jobs selectbox callback: view the chosen job's crawler"""
+    job = get_job_registry().get(st.session_state.job_select)
+    if job is not None:
+        st.session_state.job_id = job.job_id
+        st.session_state.crawler = job.crawler
+
+def reset_crawler():
+    """Start over with an empty crawler and no job selected"""
+    st.session_state.crawler = WebCrawler(index=get_content_index())
+    st.session_state.job_id = None
+    st.session_state.job_select = None
+
+def remove_crawl_job(job_id):
+    """Drop a finished job from the registry and deselect it"""
+    get_job_registry().remove(job_id)
+    reset_crawler()
+
+@st.fragment(run_every=1.0)
+def crawl_job_panel(job_id):
+    """Live progress and controls for a background crawl job"""
+    job = get_job_registry().get(job_id)
+    if job is None:
+        return
+    snap = job.snapshot()
+    state_icons = {'running': '🔄', 'paused': '⏸️', 'completed': '✅', 'cancelled': '⏹️', 'failed': '❌'}
+    
+    st.markdown(f"### {state_icons[snap['state']]} Crawl Job #{snap['job_id']} — {snap['state'].title()}")
+    
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        st.progress(min(snap['crawled'] / max(snap['max_urls'], 1), 1.0))
+    with col2:
+        if snap['replay']:
+            st.metric("Pages Replayed", snap['crawled'])
+        else:
+            st.metric("Progress", f"{snap['crawled']}/{snap['max_urls']}")
+    with col3:
+        st.metric("Speed", f"{snap['speed']:.1f} pages/sec")
+    with col4:
+        st.metric("Links Found", snap['internal'] + snap['external'])
+    
+    if snap['current_url']:
+        if snap['replay']:
+            st.info(f"📼 **Replaying:** `{snap['current_url']}`")
+        else:
+            st.info(f"🔍 **Crawling:** `{snap['current_url']}` (Depth: {snap['current_depth']})")
+    if snap['archived']:
+        st.caption(f"🗄️ {snap['archived']} WARC records written to {snap['archive_files']} file(s)")
+    if snap['archive_error']:
+        st.error(f"❌ WARC archiving stopped: {snap['archive_error']}")
+    if snap['error']:
+        st.error(f"❌ Crawl failed: {snap['error']}")
+    for message in snap['messages']:
+        st.caption(message)
+    
+    if job.is_active():
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if snap['state'] == 'paused':
+                if st.button("▶️ Resume", key=f"resume_{job_id}", use_container_width=True):
+                    job.resume()
+            elif st.button("⏸️ Pause", key=f"pause_{job_id}", use_container_width=True):
+                job.pause()
+        with col2:
+            if st.button("⏹️ Cancel", key=f"cancel_{job_id}", use_container_width=True):
+                job.cancel()
+        with col3:
+            if st.button("🔄 Refresh Results", key=f"refresh_{job_id}", use_container_width=True):
+                st.rerun()
+    
+    # Refresh the whole dashboard once when the job stops running
+    active_key = f"job_{job_id}_active"
+    was_active = st.session_state.get(active_key, False)
+    st.session_state[active_key] = job.is_active()
+    if was_active and not job.is_active():
+        st.rerun()
+
 # Enhanced Streamlit UI
 def main():
     st.set_page_config(
@@ -352,7 +1212,9 @@ def main():
         
         # Initialize session state
         if 'crawler' not in st.session_state:
-            st.session_state.crawler = WebCrawler()
+            st.session_state.crawler = WebCrawler(index=get_content_index())
+        if 'job_id' not in st.session_state:
+            st.session_state.job_id = None
         
         with st.form("crawler_config"):
             start_url = st.text_input(
@@ -363,7 +1225,7 @@ def main():
             
             keyword = st.text_input(
                 "🔍 Search Keyword",
-                help="Find URLs containing this keyword"
+                help="Rank crawled pages whose content or URL matches this keyword"
             )
             
             st.markdown("### 📊 Crawling Parameters")
@@ -389,29 +1251,92 @@ def main():
                 help="Be respectful to servers"
             )
             
+            capture_content = st.checkbox(
+                "📄 Capture page content during crawl",
+                value=True,
+                help="Store title, headings and paragraphs while crawling so scraping crawled pages needs no refetch"
+            )
+            
+            archive_responses = st.checkbox(
+                "🗄️ Archive responses to WARC",
+                value=False,
+                help=f"Write fetched pages to gzip WARC files in '{ARCHIVE_DIR}' for offline replay"
+            )
+            
             submitted = st.form_submit_button("🚀 Start Crawling", type="primary", use_container_width=True)
             
             if submitted:
                 if not start_url:
                     st.error("Please enter a valid URL")
                 else:
-                    # Reset crawler
-                    st.session_state.crawler = WebCrawler(max_urls=max_urls, delay=delay)
-                    
-                    with st.spinner("🔄 Initializing crawler..."):
-                        st.session_state.crawler.crawl_bfs(start_url, keyword, max_depth)
+                    # Start a fresh crawler on a background worker
+                    crawler = WebCrawler(
+                        max_urls=max_urls,
+                        delay=delay,
+                        index=get_content_index(),
+                        capture_content=capture_content,
+                        archive=WARCWriter(ARCHIVE_DIR) if archive_responses else None
+                    )
+                    job = get_job_registry().submit(crawler, start_url, keyword, max_depth)
+                    st.session_state.crawler = crawler
+                    st.session_state.job_id = job.job_id
+                    st.session_state.job_select = job.job_id
                     
-                    st.success("✅ Crawling completed!")
-                    st.balloons()
+                    st.success(f"🚀 Crawl job #{job.job_id} started!")
+        
+        # Offline replay of archived responses
+        with st.expander("📼 Replay WARC Archive"):
+            replay_path = st.text_input(
+                "Archive file, directory or glob",
+                value=ARCHIVE_DIR,
+                help="Re-run link extraction and scraping over archived pages without network access"
+            )
+            replay_keyword = st.text_input("🔍 Search Keyword", key="replay_keyword")
+            if st.button("📼 Start Replay", use_container_width=True):
+                replay_paths = find_archives(replay_path)
+                if not replay_paths:
+                    st.error("No WARC archives found at that path")
+                else:
+                    crawler = WebCrawler(delay=0, index=get_content_index())
+                    job = get_job_registry().submit(crawler, replay_path, replay_keyword, replay_paths=replay_paths)
+                    st.session_state.crawler = crawler
+                    st.session_state.job_id = job.job_id
+                    st.session_state.job_select = job.job_id
+                    st.success(f"📼 Replay job #{job.job_id} started over {len(replay_paths)} file(s)!")
+        
+        # Crawl jobs shared by all sessions
+        jobs = get_job_registry().list()
+        if jobs:
+            st.markdown("### 🧵 Crawl Jobs")
+            job_ids = [job.job_id for job in jobs]
+            jobs_by_id = {job.job_id: job for job in jobs}
+            # Only an explicit selection switches crawler (via the on_change callback)
+            selected_job_id = st.selectbox(
+                "View job",
+                options=job_ids,
+                index=None,
+                key="job_select",
+                on_change=select_crawl_job,
+                placeholder="Select a job to view",
+                format_func=lambda job_id: f"#{job_id} · {jobs_by_id[job_id].start_url}"
+            )
+            if selected_job_id in jobs_by_id:
+                st.caption(f"Status: {jobs_by_id[selected_job_id].state}")
+                if not jobs_by_id[selected_job_id].is_active():
+                    st.button(
+                        "🗑️ Remove Job",
+                        use_container_width=True,
+                        on_click=remove_crawl_job,
+                        args=(selected_job_id,)
+                    )
         
         # Quick Actions
         st.markdown("### 🎯 Quick Actions")
-        if st.button("🔄 Reset Crawler", use_container_width=True):
-            st.session_state.crawler = WebCrawler()
+        if st.button("🔄 Reset Crawler", use_container_width=True, on_click=reset_crawler):
             st.success("Crawler reset successfully!")
         
         if st.button("📊 Export All Data", use_container_width=True):
-            if hasattr(st.session_state.crawler, 'internal_links'):
+            if hasattr(st.session_state.crawler, 'internal_ids'):
                 # Create comprehensive export
                 all_data = {
                     'internal_links': st.session_state.crawler.internal_links,
@@ -425,8 +1350,16 @@ def main():
                     mime="application/json"
                 )
     
+    # Live status of the selected background crawl
+    if st.session_state.job_id is not None:
+        crawl_job_panel(st.session_state.job_id)
+    
     # Main Content Area
-    if hasattr(st.session_state.crawler, 'internal_links') and st.session_state.crawler.internal_links:
+    if hasattr(st.session_state.crawler, 'internal_ids') and len(st.session_state.crawler.internal_ids):
+        # Rebuild URL strings from the URL store incrementally, for display only
+        internal_links = read_links(st.session_state.crawler, 'internal')
+        external_links = read_links(st.session_state.crawler, 'external')
+        suggested_urls = read_links(st.session_state.crawler, 'suggested')
         
         # Advanced Metrics Dashboard
         st.markdown("## 📊 Crawling Analytics")
@@ -441,8 +1374,8 @@ def main():
         
         with col2:
             # Domain analysis
-            if st.session_state.crawler.external_links:
-                domains = [st.session_state.crawler.get_domain(url) for url in st.session_state.crawler.external_links]
+            if external_links:
+                domains = [st.session_state.crawler.urls.host(url_id) for url_id in st.session_state.crawler.external_ids]
                 domain_counts = pd.Series(domains).value_counts().head(10)
                 
                 fig_bar = px.bar(
@@ -467,11 +1400,11 @@ def main():
         
         with tab1:
             st.markdown("### 🔗 Internal Links Discovery")
-            if st.session_state.crawler.internal_links:
+            if internal_links:
                 # Search functionality
                 search_term = st.text_input("🔍 Search internal links:", key="internal_search")
                 
-                filtered_links = st.session_state.crawler.internal_links
+                filtered_links = internal_links
                 if search_term:
                     filtered_links = [link for link in filtered_links if search_term.lower() in link.lower()]
                 
@@ -514,11 +1447,11 @@ def main():
         
         with tab2:
             st.markdown("### 🌐 External Links Analysis")
-            if st.session_state.crawler.external_links:
+            if external_links:
                 # Search functionality
                 search_term = st.text_input("🔍 Search external links:", key="external_search")
                 
-                filtered_links = st.session_state.crawler.external_links
+                filtered_links = external_links
                 if search_term:
                     filtered_links = [link for link in filtered_links if search_term.lower() in link.lower()]
                 
@@ -571,25 +1504,55 @@ def main():
         
         with tab3:
             st.markdown("### ⭐ Keyword-Matched URLs")
-            if st.session_state.crawler.suggested_urls:
-                df_suggested = pd.DataFrame(st.session_state.crawler.suggested_urls, columns=['URL'])
+            if suggested_urls:
+                df_suggested = pd.DataFrame(suggested_urls, columns=['URL'])
+                df_suggested['Relevance'] = df_suggested['URL'].map(st.session_state.crawler.suggested_scores).fillna(0.0)
                 st.dataframe(
                     df_suggested,
                     use_container_width=True,
                     column_config={
-                        "URL": st.column_config.LinkColumn("URL")
+                        "URL": st.column_config.LinkColumn("URL"),
+                        "Relevance": st.column_config.NumberColumn("Relevance (BM25)", format="%.2f")
                     }
                 )
                 
-                st.success(f"Found {len(st.session_state.crawler.suggested_urls)} URLs matching your keyword!")
+                st.success(f"Found {len(suggested_urls)} URLs matching your keyword!")
             else:
                 st.info("⭐ No suggested URLs found. Try using a specific keyword in the crawler configuration.")
+            
+            # Ranked search over the text of every indexed page
+            st.markdown("#### 🔎 Search Page Content")
+            content_index = st.session_state.crawler.index
+            if content_index is not None:
+                content_query = st.text_input(
+                    f"🔍 Search {content_index.count()} indexed pages:",
+                    key="content_search"
+                )
+                if content_query:
+                    search_start = time.perf_counter()
+                    results = content_index.search(content_query, limit=100)
+                    search_ms = (time.perf_counter() - search_start) * 1000
+                    
+                    if results:
+                        df_results = pd.DataFrame(results, columns=['url', 'title', 'score'])
+                        df_results.columns = ['URL', 'Title', 'Relevance']
+                        st.dataframe(
+                            df_results,
+                            use_container_width=True,
+                            column_config={
+                                "URL": st.column_config.LinkColumn("URL"),
+                                "Relevance": st.column_config.NumberColumn("Relevance (BM25)", format="%.2f")
+                            }
+                        )
+                        st.caption(f"{len(results)} results in {search_ms:.1f} ms")
+                    else:
+                        st.info("No indexed pages match your search.")
         
         with tab4:
             st.markdown("### 📄 Intelligent Content Scraper")
             
             # URL selection for scraping
-            all_urls = st.session_state.crawler.internal_links + [start_url] if 'start_url' in locals() else st.session_state.crawler.internal_links
+            all_urls = internal_links + [start_url] if 'start_url' in locals() else internal_links
             
             if all_urls:
                 selected_url = st.selectbox(
@@ -601,6 +1564,9 @@ def main():
                 col1, col2 = st.columns([1, 3])
                 with col1:
                     scrape_button = st.button("🔍 Scrape Content", type="primary", use_container_width=True)
+                with col2:
+                    if st.session_state.crawler.get_record(selected_url) is not None:
+                        st.caption("⚡ Captured during crawl — shown without refetching the page")
                 
                 if scrape_button and selected_url:
                     with st.spinner("🔄 Extracting content..."):
@@ -674,13 +1640,13 @@ def main():
         with tab5:
             st.markdown("### 🔍 Advanced Link Analysis")
             
-            if st.session_state.crawler.internal_links:
+            if internal_links:
                 # URL pattern analysis
                 st.markdown("#### 📊 URL Pattern Analysis")
                 
                 # Analyze URL patterns
                 url_patterns = {}
-                for url in st.session_state.crawler.internal_links:
+                for url in internal_links:
                     path = urlparse(url).path
                     if path:
                         # Extract file extension or path pattern
@@ -713,16 +1679,16 @@ def main():
                 perf_col1, perf_col2, perf_col3 = st.columns(3)
                 
                 with perf_col1:
-                    avg_links_per_page = len(st.session_state.crawler.internal_links) / max(len(st.session_state.crawler.visited_urls), 1)
+                    avg_links_per_page = len(internal_links) / max(st.session_state.crawler.visited_count, 1)
                     st.metric("Avg Links/Page", f"{avg_links_per_page:.1f}")
                 
                 with perf_col2:
-                    internal_external_ratio = len(st.session_state.crawler.internal_links) / max(len(st.session_state.crawler.external_links), 1)
+                    internal_external_ratio = len(internal_links) / max(len(external_links), 1)
                     st.metric("Internal/External Ratio", f"{internal_external_ratio:.1f}")
                 
                 with perf_col3:
                     if hasattr(st.session_state.crawler, 'crawl_stats'):
-                        efficiency = len(st.session_state.crawler.internal_links) / max(st.session_state.crawler.crawl_stats['total_time'], 1)
+                        efficiency = len(internal_links) / max(st.session_state.crawler.crawl_stats['total_time'], 1)
                         st.metric("Links/Second", f"{efficiency:.1f}")
             else:
                 st.info("🔍 No data available for analysis. Please crawl a website first.")